@@ -1,60 +1,37 @@
 from reportlab.lib.pagesizes import landscape
 from reportlab.pdfgen import canvas
-from PIL import Image
+from reportlab.lib.utils import ImageReader
 import os
+import io
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from tiling import prepare_tiles, draw_tiled_columns
 
-def create_large_pdf(image_path, height_ft, width_ft=2, dpi=600):
+def create_large_pdf(prepared_image, new_width, new_height, base_name, height_ft):
     """
-    Create a tiled large-format PDF from an image, duplicating it vertically to fill the full height with improved quality.
+    Create a tiled large-format PDF from an image prepared by tiling.prepare_tiles,
+    duplicating it vertically to fill the full height with improved quality.
     
-    :param image_path: Path to the input image
-    :param width_ft: Width of each tile in feet (fixed at 24 inches = 2 feet)
+    :param prepared_image: JPEG bytes of the tile, exactly as wide as the page (24 inches = 2 feet)
+    :param new_width: Width of the tile in points
+    :param new_height: Height of the tile in points
+    :param base_name: Image name the output file is named after
     :param height_ft: Height of the total print in feet (either 13 or 27 feet)
-    :param dpi: Resolution in dots per inch (default is 600 DPI for higher quality)
     """
     # Convert feet to points (1 inch = 72 points, 1 foot = 12 inches)
-    tile_width_points = width_ft * 12 * 72
     total_height_points = height_ft * 12 * 72
     
     # Generate output PDF name based on image name and height
-    base_name = os.path.splitext(os.path.basename(image_path))[0]
     output_pdf = f"{base_name}_{height_ft}ft.pdf"
     
-    # Open the image and enhance quality
-    img = Image.open(image_path)
-    img = img.convert("RGB")  # Ensure compatibility
-    img_width, img_height = img.size
-    
-    # Calculate the scaling factor to make the image exactly 24 inches wide
-    scale_factor = tile_width_points / img_width
-    new_width = tile_width_points  # Make the image exactly 24 inches wide
-    new_height = img_height * scale_factor
-    
-    # Resize image to improve quality when scaled
-    img = img.resize((int(new_width), int(new_height)), Image.LANCZOS)
-    
-    # Calculate how many times the image needs to be repeated vertically
-    tile_count = int(total_height_points / new_height) + 1
-    
     # Create PDF
-    c = canvas.Canvas(output_pdf, pagesize=(tile_width_points, total_height_points))
-    
-    # Save the processed image temporarily
-    temp_image_path = f"{base_name}_temp.jpg"
-    img.save(temp_image_path, quality=95, dpi=(dpi, dpi))
+    c = canvas.Canvas(output_pdf, pagesize=(new_width, total_height_points))
     
-    # Place the image multiple times to fill the entire height
-    y_position = 0
-    for _ in range(tile_count):
-        c.drawImage(temp_image_path, 0, y_position, new_width, new_height, preserveAspectRatio=True, mask='auto')
-        y_position += new_height  # Move up for the next tile
+    # Place the tile multiple times to fill the entire height
+    draw_tiled_columns(c, ImageReader(io.BytesIO(prepared_image)), [0], new_width, new_height, total_height_points)
     
     c.showPage()
     c.save()
     
-    # Remove the temporary image file
-    os.remove(temp_image_path)
-    
     print(f"PDF saved to {output_pdf}")
 
 if __name__ == "__main__":
@@ -63,6 +40,16 @@ if __name__ == "__main__":
     if not os.path.exists(image_path):
         print("Error: The specified image file does not exist.")
     else:
-        # Generate both 13ft and 27ft PDFs
-        create_large_pdf(image_path, height_ft=13)
-        create_large_pdf(image_path, height_ft=27)
+        base_name = os.path.splitext(os.path.basename(image_path))[0]
+        heights = [13, 27]
+        
+        # Resize the image once to exactly 24 inches wide (2 feet), before any worker starts,
+        # keeping only what fits on each page; workers just read the shared JPEG bytes
+        tiles = prepare_tiles(image_path, 2 * 12 * 72, heights, dpi=600)
+        
+        # Generate both 13ft and 27ft PDFs in parallel, with no more workers than there are tasks
+        with ProcessPoolExecutor(max_workers=min(len(heights), os.cpu_count() or 1)) as executor:
+            futures = [executor.submit(create_large_pdf, *tiles[height], base_name, height_ft=height)
+                       for height in heights]
+            for future in as_completed(futures):
+                future.result()
@@ -1,123 +1,73 @@
 from reportlab.pdfgen import canvas
-from PIL import Image
+from reportlab.lib.utils import ImageReader
 import os
+import io
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from tiling import prepare_tiles, draw_tiled_columns
 
-def create_large_pdf(image_path, height_ft, label, width_ft=2, dpi=600):
+def create_large_pdf(prepared_image, new_width, new_height, base_name, height_ft, label):
     """
-    Create a tiled large-format PDF from an image, duplicating it vertically to fill the full height.
+    Create a tiled large-format PDF from an image prepared by tiling.prepare_tiles,
+    duplicating it vertically to fill the full height.
     
-    :param image_path: Path to the input image
+    :param prepared_image: JPEG bytes of the tile, exactly as wide as the page (2 feet)
+    :param new_width: Width of the tile in points
+    :param new_height: Height of the tile in points
+    :param base_name: Image name the output file is named after
     :param height_ft: Height of the total print in feet (13 or 27)
     :param label: Label to append to the file name ("P&S" or "TRAD")
-    :param width_ft: Width of each tile in feet (default is 2 feet)
-    :param dpi: Resolution in dots per inch (default is 600 DPI)
     """
     # Convert feet to points (1 inch = 72 points, 1 foot = 12 inches)
-    tile_width_points = width_ft * 12 * 72
     total_height_points = height_ft * 12 * 72
     
     # Generate output PDF name based on image name, height, and label
-    base_name = os.path.splitext(os.path.basename(image_path))[0]
     output_pdf = f"{base_name}_{height_ft}ft_{label}.pdf"
     
-    # Open the image and enhance quality
-    img = Image.open(image_path)
-    img = img.convert("RGB")  # Ensure compatibility
-    img_width, img_height = img.size
-    
-    # Calculate the scaling factor to make the image exactly 24 inches wide
-    scale_factor = tile_width_points / img_width
-    new_width = tile_width_points  # Make the image exactly 24 inches wide
-    new_height = img_height * scale_factor
-    
-    # Resize image with highest quality resampling
-    img = img.resize((int(new_width), int(new_height)), Image.Resampling.LANCZOS)
-    
-    # Calculate how many times the image needs to be repeated vertically
-    tile_count = int(total_height_points / new_height) + 1
-    
     # Create PDF
-    c = canvas.Canvas(output_pdf, pagesize=(tile_width_points, total_height_points))
+    c = canvas.Canvas(output_pdf, pagesize=(new_width, total_height_points))
     c.setAuthor("Automated PDF Generator")
     c.setTitle(f"{base_name} {height_ft}ft {label}")
     
-    # Save the processed image as PNG for lossless quality
-    temp_image_path = f"{base_name}_temp.png"
-    img.save(temp_image_path, format="PNG", dpi=(dpi, dpi))
-    
-    # Place the image multiple times to fill the entire height
-    y_position = 0
-    for _ in range(tile_count):
-        c.drawImage(temp_image_path, 0, y_position, new_width, new_height, preserveAspectRatio=True, mask='auto')
-        y_position += new_height  # Move up for the next tile
+    # Place the tile multiple times to fill the entire height
+    draw_tiled_columns(c, ImageReader(io.BytesIO(prepared_image)), [0], new_width, new_height, total_height_points)
     
     c.showPage()
     c.save()
     
-    # Remove the temporary image file
-    os.remove(temp_image_path)
-    
     print(f"PDF saved to {output_pdf}")
 
-def create_double_blade_pdf(image_path, height_ft, label, width_ft=2, dpi=600, spacing_points=20):
+def create_double_blade_pdf(prepared_image, new_width, new_height, base_name, height_ft, label, spacing_points=20):
     """
-    Create a double-bladed tiled large-format PDF from an image, duplicating it side by side
-    with a small white vertical space in between.
+    Create a double-bladed tiled large-format PDF from an image prepared by tiling.prepare_tiles,
+    duplicating it side by side with a small white vertical space in between.
     
-    :param image_path: Path to the input image
+    :param prepared_image: JPEG bytes of the tile, exactly as wide as one blade (2 feet)
+    :param new_width: Width of the tile in points
+    :param new_height: Height of the tile in points
+    :param base_name: Image name the output file is named after
     :param height_ft: Height of the total print in feet (13 or 27)
     :param label: Label to append to the file name ("P&S" or "TRAD")
-    :param width_ft: Width of each tile in feet (default is 2 feet, but doubled in final output)
-    :param dpi: Resolution in dots per inch (default is 600 DPI)
     :param spacing_points: Vertical spacing between the two images in points
     """
     # Convert feet to points (1 inch = 72 points, 1 foot = 12 inches)
-    tile_width_points = width_ft * 12 * 72
-    total_width_points = 2 * tile_width_points + spacing_points  # Double width with spacing
+    total_width_points = 2 * new_width + spacing_points  # Double width with spacing
     total_height_points = height_ft * 12 * 72
     
     # Generate output PDF name based on image name, height, and label
-    base_name = os.path.splitext(os.path.basename(image_path))[0]
     output_pdf = f"{base_name}_{height_ft}ft_{label}_DoubleBlade.pdf"
     
-    # Open the image and enhance quality
-    img = Image.open(image_path)
-    img = img.convert("RGB")  # Ensure compatibility
-    img_width, img_height = img.size
-    
-    # Calculate the scaling factor to make the image exactly 24 inches wide
-    scale_factor = tile_width_points / img_width
-    new_width = tile_width_points  # Make the image exactly 24 inches wide
-    new_height = img_height * scale_factor
-    
-    # Resize image with highest quality resampling
-    img = img.resize((int(new_width), int(new_height)), Image.Resampling.LANCZOS)
-    
-    # Calculate how many times the image needs to be repeated vertically
-    tile_count = int(total_height_points / new_height) + 1
-    
     # Create PDF
     c = canvas.Canvas(output_pdf, pagesize=(total_width_points, total_height_points))
     c.setAuthor("Automated PDF Generator")
     c.setTitle(f"{base_name} {height_ft}ft {label} Double Blade")
     
-    # Save the processed image as PNG for lossless quality
-    temp_image_path = f"{base_name}_temp.png"
-    img.save(temp_image_path, format="PNG", dpi=(dpi, dpi))
-    
-    # Place the image multiple times to fill the entire height
-    y_position = 0
-    for _ in range(tile_count):
-        c.drawImage(temp_image_path, 0, y_position, new_width, new_height, preserveAspectRatio=True, mask='auto')
-        c.drawImage(temp_image_path, new_width + spacing_points, y_position, new_width, new_height, preserveAspectRatio=True, mask='auto')
-        y_position += new_height  # Move up for the next tile
+    # Place both blades side by side, repeated to fill the entire height
+    draw_tiled_columns(c, ImageReader(io.BytesIO(prepared_image)), [0, new_width + spacing_points],
+                       new_width, new_height, total_height_points)
     
     c.showPage()
     c.save()
     
-    # Remove the temporary image file
-    os.remove(temp_image_path)
-    
     print(f"PDF saved to {output_pdf}")
 
 if __name__ == "__main__":
@@ -126,14 +76,25 @@ if __name__ == "__main__":
     if not os.path.exists(image_path):
         print("Error: The specified image file does not exist.")
     else:
-        # Generate standard PDFs
-        create_large_pdf(image_path, height_ft=13, label="P&S")
-        create_large_pdf(image_path, height_ft=13, label="TRAD")
-        create_large_pdf(image_path, height_ft=27, label="P&S")
-        create_large_pdf(image_path, height_ft=27, label="TRAD")
+        base_name = os.path.splitext(os.path.basename(image_path))[0]
+        heights = [13, 27]
+        
+        # Resize the image once to exactly 2 feet wide, before any worker starts, keeping only
+        # what fits on each page; every variant of a height shares its tile's JPEG bytes
+        tiles = prepare_tiles(image_path, 2 * 12 * 72, heights, dpi=600)
         
-        # Generate double-blade PDFs
-        create_double_blade_pdf(image_path, height_ft=13, label="P&S")
-        create_double_blade_pdf(image_path, height_ft=13, label="TRAD")
-        create_double_blade_pdf(image_path, height_ft=27, label="P&S")
-        create_double_blade_pdf(image_path, height_ft=27, label="TRAD")
+        # One (create function, height, label) task per variant; standard and double-blade PDFs
+        # write separate files, so they can be generated in parallel, with no more workers than tasks
+        tasks = [
+            (create_pdf_func, height, label)
+            for create_pdf_func in [create_large_pdf, create_double_blade_pdf]
+            for height in heights
+            for label in ["P&S", "TRAD"]
+        ]
+        with ProcessPoolExecutor(max_workers=min(len(tasks), os.cpu_count() or 1)) as executor:
+            futures = [
+                executor.submit(create_pdf_func, *tiles[height], base_name, height_ft=height, label=label)
+                for create_pdf_func, height, label in tasks
+            ]
+            for future in as_completed(futures):
+                future.result()
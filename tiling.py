@@ -0,0 +1,178 @@
+import io
+import math
+import struct
+from PIL import Image, ImageFilter, ImageStat
+
+# Print-resolution sources routinely exceed Pillow's decompression-bomb limit
+Image.MAX_IMAGE_PIXELS = None
+
+# Decoded sources larger than this are halved with reduce() before the RGB copy is made
+LARGE_IMAGE_BYTES = 2 * 1024 ** 3
+
+# Sources above this many pixels are resized on the GPU when PyTorch with CUDA is available
+GPU_RESIZE_MIN_PIXELS = 4000 * 4000
+
+def _resize_lanczos_gpu(img, new_width, new_height):
+    """
+    Resize an RGB image on the GPU using antialiased bicubic interpolation.
+    Returns None when PyTorch or a CUDA device is unavailable so callers can fall back to Pillow.
+    """
+    try:
+        import numpy as np
+        import torch
+    except ImportError:
+        return None
+    if not torch.cuda.is_available():
+        return None
+
+    # HWC uint8 -> NCHW float on the device
+    tensor = torch.from_numpy(np.array(img)).to("cuda").permute(2, 0, 1).unsqueeze(0).float()
+    resized = torch.nn.functional.interpolate(tensor, size=(new_height, new_width), mode="bicubic", antialias=True)
+    pixels = resized.squeeze(0).permute(1, 2, 0).clamp(0, 255).round().to(torch.uint8).contiguous().cpu().numpy()
+    return Image.fromarray(pixels)
+
+def _open_source_image(image_path, target_width=None):
+    """
+    Open the source image as RGB, decoding no more pixels than a resize to target_width needs.
+    """
+    # Close the source as soon as the RGB copy exists so its file handle and full-size buffer are released
+    with Image.open(image_path) as source:
+        img = source
+        if target_width and img.format == "JPEG":
+            # Let libjpeg downscale while decoding, keeping ~2x the target for the LANCZOS pass
+            target_height = int(img.height * target_width / img.width)
+            img.draft("RGB", (int(target_width) * 2, target_height * 2))
+
+        # Halving a source at least 6x wider than the target costs no visible quality, since
+        # resize(reducing_gap=3.0) reduce()s it anyway, but only after convert() copied it at full size
+        decoded_bytes = img.width * img.height * len(img.getbands())
+        if (target_width and decoded_bytes > LARGE_IMAGE_BYTES and img.width // 2 >= target_width * 3
+                and img.mode in ("L", "LA", "RGB", "RGBA")):
+            print(f"Large image ({decoded_bytes / 1e9:.1f} GB decoded), halving before conversion")
+            img = img.reduce(2)
+        return img.convert("RGB")
+
+def _f32(value):
+    """
+    Round value to single precision, the float type Image.blend computes in.
+    """
+    return struct.unpack("f", struct.pack("f", value))[0]
+
+def _contrast_brightness_lut(img, contrast, brightness):
+    """
+    Build a lookup table applying ImageEnhance.Contrast then ImageEnhance.Brightness in one pass.
+    Contrast blends towards the mean luminance, brightness scales towards black; each step
+    computes in single precision and truncates and clips to 8 bits as Image.blend does,
+    so the table reproduces the two passes exactly.
+    """
+    mean = int(ImageStat.Stat(img.convert("L")).mean[0] + 0.5)
+    contrast, brightness = _f32(contrast), _f32(brightness)
+    table = []
+    for v in range(256):
+        contrasted = min(255, max(0, int(_f32(mean + _f32(contrast * (v - mean))))))
+        table.append(min(255, max(0, int(_f32(brightness * contrasted)))))
+    return table * len(img.getbands())
+
+def _sharpness_kernel(sharpness):
+    """
+    Fold ImageEnhance.Sharpness (a blend with the SMOOTH filter) into a single 3x3 convolution.
+    This approximates ImageEnhance.Sharpness: it rounds once where the filter-then-blend
+    pair rounds twice, so pixels can differ from it by a level.
+    """
+    # SMOOTH is [1, 1, 1, 1, 5, 1, 1, 1, 1] / 13; out = sharpness * img - (sharpness - 1) * smooth
+    edge = -(sharpness - 1) / 13
+    center = sharpness - (sharpness - 1) * 5 / 13
+    return ImageFilter.Kernel((3, 3), [edge] * 4 + [center] + [edge] * 4, scale=1)
+
+def enhance_image(image_path, contrast=1.2, brightness=1.1, sharpness=1.3, target_width=None):
+    """
+    Enhance image quality with adjustable parameters and return the enhanced PIL image.
+    When target_width is given, large sources are decoded at reduced size (see _open_source_image).
+    """
+    img = _open_source_image(image_path, target_width)
+
+    # Apply enhancements in two passes instead of three, skipping any that would be identity
+    if contrast != 1 or brightness != 1:
+        img = img.point(_contrast_brightness_lut(img, contrast, brightness))
+    if sharpness != 1:
+        img = img.filter(_sharpness_kernel(sharpness))
+
+    return img
+
+def prepare_tile(image_path, width_points, max_height_points=None, dpi=600, enhance=False):
+    """
+    Open (and optionally enhance) the source image and resize it once to a tile width_points wide.
+    Sources taller than max_height_points once scaled are cut down to the visible bottom band.
+    Returns the encoded JPEG bytes along with the tile's (new_width, new_height) in points;
+    plain bytes can be handed to worker processes, unlike an ImageReader.
+    """
+    if enhance:
+        img = enhance_image(image_path, target_width=width_points)
+    else:
+        img = _open_source_image(image_path, width_points)
+    img_width, img_height = img.size
+
+    # Scale the image to fill the tile width exactly
+    scale_factor = width_points / img_width
+    new_width = int(width_points)  # Convert to integer for PIL
+    new_height = int(img_height * scale_factor)
+
+    # A source taller than the tallest page only shows its bottom band, so resize just that band
+    box = None
+    if max_height_points and new_height > max_height_points:
+        box = (0, img_height - max_height_points / scale_factor, img_width, img_height)
+        new_height = int(max_height_points)
+
+    # Resize image using high-quality resampling, on the GPU for very large sources;
+    # skip it when the source already fits, and use the cheaper BICUBIC filter for enlargements
+    if box is not None or (new_width, new_height) != (img_width, img_height):
+        resized = None
+        if new_width > img_width:
+            resized = img.resize((new_width, new_height), Image.Resampling.BICUBIC, box=box)
+        elif img_width * img_height > GPU_RESIZE_MIN_PIXELS:
+            resized = _resize_lanczos_gpu(img if box is None else img.crop(tuple(round(v) for v in box)),
+                                          new_width, new_height)
+        if resized is None:
+            resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS, box=box, reducing_gap=3.0)
+        img = resized
+
+    # Encode the resized image as full-chroma JPEG;
+    # JPEG is embedded as-is by ReportLab (DCTDecode), so no re-encoding happens at draw time
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=95, subsampling=0, optimize=True, dpi=(dpi, dpi))
+
+    return buffer.getvalue(), new_width, new_height
+
+def prepare_tiles(image_path, width_points, heights_ft, dpi=600, enhance=False):
+    """
+    Prepare the tile for each page height in heights_ft, keyed by height.
+    The tallest page's tile is reused for every shorter page it already fits on;
+    only pages that cut the source down to a shorter bottom band get their own tile.
+    """
+    tallest_tile = prepare_tile(image_path, width_points, max(heights_ft) * 12 * 72, dpi, enhance)
+    tiles = {}
+    for height_ft in heights_ft:
+        if tallest_tile[2] <= height_ft * 12 * 72:
+            tiles[height_ft] = tallest_tile
+        else:
+            tiles[height_ft] = prepare_tile(image_path, width_points, height_ft * 12 * 72, dpi, enhance)
+    return tiles
+
+def draw_tiled_columns(c, img_reader, x_positions, new_width, new_height, total_height):
+    """
+    Fill the canvas from the bottom up to total_height with rows of the tile,
+    one copy per x position in each row (two for double-blade prints).
+    """
+    # Draw one row as a form XObject so every repetition references the same object
+    c.beginForm("tile", 0, 0, x_positions[-1] + new_width, new_height)
+    for x_position in x_positions:
+        c.drawImage(img_reader, x_position, 0, width=new_width, height=new_height)
+    c.endForm()
+
+    # Stack the row up the page with one cumulative translate per row inside a single saved state
+    tile_count = math.ceil(total_height / new_height)  # Only tiles that reach the page
+    c.saveState()
+    for _ in range(tile_count):
+        c.doForm("tile")
+        c.translate(0, new_height)  # Move up for the next tile
+    c.restoreState()